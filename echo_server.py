@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Легковесная echo-цель для проверки прокси.
+
+Отвечает на GET-запросы JSON в формате httpbin.org/ip: {"origin": "<ip>"},
+где ip - адрес, с которого пришло TCP-соединение (выходной IP прокси).
+Не требует Flask и других зависимостей, поэтому его можно развернуть
+рядом с прокси и указать как probe_url при тестировании:
+
+    python echo_server.py --host 0.0.0.0 --port 8080
+"""
+
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    """Возвращает адрес клиента на любой GET-запрос"""
+
+    server_version = 'ProxyEcho/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = json.dumps({'origin': self.client_address[0]}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        # Логи каждого запроса заметно тормозят сервер под нагрузкой проверок
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class EchoServer(ThreadingHTTPServer):
+    """HTTP-сервер с длинной очередью входящих соединений
+
+    request_queue_size читается в server_activate() при вызове listen(),
+    поэтому задается атрибутом класса, а не после создания сервера.
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+    verbose = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Echo-цель для проверки прокси')
+    parser.add_argument('--host', default='0.0.0.0', help='Адрес для прослушивания')
+    parser.add_argument('--port', type=int, default=8080, help='Порт для прослушивания')
+    parser.add_argument('--verbose', action='store_true', help='Логировать каждый запрос')
+    args = parser.parse_args()
+
+    server = EchoServer((args.host, args.port), EchoHandler)
+    server.verbose = args.verbose
+    print(f"Echo server listening on http://{args.host}:{args.port}/ip")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
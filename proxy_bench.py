@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Офлайн-бенчмарк проверки прокси на локальном парке фейковых прокси.
+
+Запускает в отдельном процессе сотни или тысячи HTTP-прокси на соседних
+портах и echo-цель, через которую они отвечают. Поведение парка задается
+параметрами: распределение задержки, доля отказов, таймаутов, ошибок
+авторизации и закрытых портов, число общих выходных IP. Затем прогоняет
+run_proxy_test для каждого движка и уровня параллельности и сохраняет
+пропускную способность, время, пиковый RSS и число потоков в JSON:
+
+    python proxy_bench.py --proxies 1000 --engines asyncio,threads --concurrency 50,200,500
+
+Выходные IP моделируются адресами 127.0.0.2, 127.0.0.3, ...: прокси
+подключается к echo-цели с такого адреса, и echo возвращает его как
+origin. Это работает на Linux; на других системах все прокси получают
+один выходной IP.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import psutil
+
+
+def _raise_fd_limit(required):
+    """Поднимает лимит открытых файлов под слушающие сокеты парка"""
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = required + 256
+    if soft != resource.RLIM_INFINITY and soft < wanted:
+        new_soft = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+        with contextlib.suppress(ValueError, OSError):
+            resource.setrlimit(resource.RLIMIT_NOFILE, (new_soft, hard))
+
+
+def _loopback_aliases_supported():
+    """Можно ли привязать исходящий сокет к 127.0.0.2 (есть на Linux)"""
+    import socket
+    try:
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.2', 0))
+        return True
+    except OSError:
+        return False
+
+
+def assign_profiles(args):
+    """Поведение каждого порта парка: refused, timeout, fail, auth или ok"""
+    rng = random.Random(args.seed)
+    profiles = {}
+    for index in range(args.proxies):
+        roll = rng.random()
+        if roll < args.refused_rate:
+            kind = 'refused'
+        elif roll < args.refused_rate + args.timeout_rate:
+            kind = 'timeout'
+        elif roll < args.refused_rate + args.timeout_rate + args.fail_rate:
+            kind = 'fail'
+        elif roll < args.refused_rate + args.timeout_rate + args.fail_rate + args.auth_fail_rate:
+            kind = 'auth'
+        else:
+            kind = 'ok'
+        profiles[args.base_port + index] = kind
+    return profiles
+
+
+async def _serve_echo(reader, writer):
+    """Echo-цель: отвечает адресом, с которого пришло соединение"""
+    try:
+        await reader.readuntil(b'\r\n\r\n')
+        body = json.dumps({'origin': writer.get_extra_info('peername')[0]}).encode()
+        writer.write(
+            b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+            b'Content-Length: %d\r\nConnection: close\r\n\r\n' % len(body) + body
+        )
+        await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _serve_proxy(reader, writer, kind, exit_ip, args, rng):
+    """Фейковый HTTP-прокси: пересылает запрос в абсолютной форме на echo-цель"""
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+        if kind == 'timeout':
+            await asyncio.sleep(3600)
+            return
+
+        latency = rng.lognormvariate(0, args.jitter) * args.latency_ms / 1000 if args.jitter else args.latency_ms / 1000
+        await asyncio.sleep(latency)
+
+        if kind == 'auth':
+            writer.write(b'HTTP/1.1 407 Proxy Authentication Required\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+            await writer.drain()
+            return
+        if kind == 'fail':
+            writer.write(b'HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+            await writer.drain()
+            return
+
+        # GET http://host:port/path HTTP/1.1 -> GET /path HTTP/1.1 на echo-цель
+        method, target, version = head.split(b'\r\n', 1)[0].split(b' ', 2)
+        path = b'/' + target.split(b'/', 3)[3] if target.count(b'/') >= 3 else b'/'
+        upstream_reader, upstream_writer = await asyncio.open_connection(
+            '127.0.0.1', args.echo_port, local_addr=(exit_ip, 0) if exit_ip else None
+        )
+        try:
+            upstream_writer.write(
+                method + b' ' + path + b' ' + version +
+                b'\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n'
+            )
+            await upstream_writer.drain()
+            writer.write(await upstream_reader.read())
+            await writer.drain()
+        finally:
+            upstream_writer.close()
+    except (asyncio.IncompleteReadError, ConnectionError, OSError):
+        pass
+    finally:
+        writer.close()
+
+
+def run_fleet(args, ready):
+    """Точка входа процесса парка: поднимает echo и прокси, затем ждет завершения"""
+    _raise_fd_limit(args.proxies + 1024)
+    profiles = assign_profiles(args)
+    aliases = _loopback_aliases_supported()
+    rng = random.Random(args.seed)
+
+    async def main():
+        servers = [await asyncio.start_server(_serve_echo, '127.0.0.1', args.echo_port, backlog=4096)]
+        for index, (port, kind) in enumerate(profiles.items()):
+            if kind == 'refused':
+                continue
+            exit_index = index % args.exit_ips
+            exit_ip = f'127.0.{exit_index // 250}.{2 + exit_index % 250}' if aliases else None
+
+            def handler(reader, writer, kind=kind, exit_ip=exit_ip):
+                return _serve_proxy(reader, writer, kind, exit_ip, args, rng)
+
+            servers.append(await asyncio.start_server(handler, '127.0.0.1', port, backlog=1024))
+        ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+class ResourceSampler:
+    """Фоновый замер пикового RSS и числа потоков текущего процесса"""
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.peak_rss = 0
+        self.peak_threads = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        self.peak_rss = max(self.peak_rss, self.process.memory_info().rss)
+        self.peak_threads = max(self.peak_threads, self.process.num_threads())
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            self._sample()
+            self.stop_event.wait(self.interval)
+
+    def __enter__(self):
+        self._sample()
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop_event.set()
+        self.thread.join()
+        # Поток замера не считается в результатах
+        self.peak_threads -= 1
+
+
+def bench_once(app_module, args, engine, concurrency):
+    """Один прогон run_proxy_test с заданным движком и параллельностью"""
+    lines = (
+        f'bench{index}:secret@127.0.0.1:{args.base_port + index % args.proxies}'
+        for index in range(args.probes)
+    )
+    job = app_module.ProxyTestJob(
+        f'bench_{engine}_{concurrency}',
+        engine=engine,
+        concurrency=concurrency,
+        probe_url=f'http://127.0.0.1:{args.echo_port}/ip',
+        cache_ttl=0,
+        total=args.probes,
+        adaptive=args.adaptive,
+        precheck_timeout=args.precheck_timeout if args.precheck else None,
+        probe_timeout=args.timeout,
+    )
+    budget = app_module.ProbeBudget(max(concurrency * 2, app_module.PROXY_TEST_GLOBAL_CONCURRENCY))
+
+    with open(os.devnull, 'w') as devnull, ResourceSampler() as sampler:
+        started = time.perf_counter()
+        # Лог каждого рабочего прокси остается включенным, но уходит в никуда
+        with contextlib.redirect_stdout(devnull):
+            app_module.run_proxy_test(job, lines, budget)
+        wall = time.perf_counter() - started
+
+    progress = job.progress_snapshot()
+    return {
+        'engine': engine,
+        'concurrency': job.concurrency,
+        'adaptive': args.adaptive,
+        'precheck': args.precheck,
+        'probes': progress['current'],
+        'wall_s': round(wall, 3),
+        'probes_per_s': round(progress['current'] / wall, 1) if wall else None,
+        'working': progress['working'],
+        'failed': progress['failed'],
+        'unique_ips': progress['unique_ips'],
+        'precheck_failed': progress['precheck_failed'],
+        'peak_rss_mb': round(sampler.peak_rss / 1024 / 1024, 1),
+        'peak_threads': sampler.peak_threads,
+        'latency_ms': app_module.summarize_proxy_latency(job.working_results())['total_ms'],
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Офлайн-бенчмарк проверки прокси')
+    parser.add_argument('--proxies', type=int, default=500, help='Размер парка фейковых прокси (портов)')
+    parser.add_argument('--probes', type=int, help='Проверок за прогон (по умолчанию равно --proxies)')
+    parser.add_argument('--base-port', type=int, default=20000, help='Первый порт парка')
+    parser.add_argument('--echo-port', type=int, default=19999, help='Порт echo-цели')
+    parser.add_argument('--engines', default='asyncio,threads', help='Движки через запятую')
+    parser.add_argument('--concurrency', default='50,200', help='Уровни параллельности через запятую')
+    parser.add_argument('--latency-ms', type=float, default=50, help='Медианная задержка ответа прокси')
+    parser.add_argument('--jitter', type=float, default=0.5, help='Сигма логнормального разброса задержки')
+    parser.add_argument('--fail-rate', type=float, default=0.1, help='Доля прокси, отвечающих 502')
+    parser.add_argument('--timeout-rate', type=float, default=0.05, help='Доля прокси, не отвечающих вовсе')
+    parser.add_argument('--auth-fail-rate', type=float, default=0.05, help='Доля прокси, отвечающих 407')
+    parser.add_argument('--refused-rate', type=float, default=0.1, help='Доля закрытых портов')
+    parser.add_argument('--exit-ips', type=int, default=50, help='Число различных выходных IP')
+    parser.add_argument('--timeout', type=float, default=3, help='Таймаут одной проверки, секунды')
+    parser.add_argument('--adaptive', action='store_true', help='Адаптивная параллельность')
+    parser.add_argument('--precheck', action='store_true', help='Предварительная TCP-проверка')
+    parser.add_argument('--precheck-timeout', type=float, default=1.0, help='Таймаут TCP-проверки, секунды')
+    parser.add_argument('--seed', type=int, default=1, help='Зерно генератора профилей парка')
+    parser.add_argument('--output', default=os.path.join(tempfile.gettempdir(), 'bench_results.json'),
+                        help='Файл для результатов в JSON (по умолчанию во временной директории)')
+    args = parser.parse_args()
+    args.probes = args.probes or args.proxies
+    args.exit_ips = max(1, args.exit_ips)
+    return args
+
+
+def main():
+    args = parse_args()
+
+    # Кэш здоровья и прочие файлы приложения - во временный каталог
+    files_dir = tempfile.mkdtemp(prefix='proxy_bench_')
+    os.environ['CRYPTO_PLAYGROUND_FILES'] = files_dir
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as app_module
+
+    ready = multiprocessing.Event()
+    fleet = multiprocessing.Process(target=run_fleet, args=(args, ready), daemon=True)
+    fleet.start()
+    if not ready.wait(60):
+        fleet.terminate()
+        sys.exit('Парк прокси не запустился за 60 секунд')
+    print(f"Fleet of {args.proxies} proxies on ports {args.base_port}-{args.base_port + args.proxies - 1}, "
+          f"echo on {args.echo_port}")
+
+    runs = []
+    try:
+        for engine in args.engines.split(','):
+            for concurrency in (int(value) for value in args.concurrency.split(',')):
+                result = bench_once(app_module, args, engine, concurrency)
+                runs.append(result)
+                print(
+                    f"{engine:>8} c={result['concurrency']:<5} {result['probes_per_s']:>9} probes/s  "
+                    f"wall {result['wall_s']:>7}s  rss {result['peak_rss_mb']:>7} MB  "
+                    f"threads {result['peak_threads']:>4}  working {result['working']}/{result['probes']}"
+                )
+    finally:
+        fleet.terminate()
+        fleet.join()
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'fleet': {
+            key: getattr(args, key)
+            for key in ('proxies', 'probes', 'latency_ms', 'jitter', 'fail_rate', 'timeout_rate',
+                        'auth_fail_rate', 'refused_rate', 'exit_ips', 'timeout', 'seed')
+        },
+        'runs': runs,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -181,7 +181,7 @@ if exist "requirements.txt" (
     if errorlevel 1 (
         call :print_warning "Некоторые зависимости не удалось установить"
         echo %YELLOW%Попробуем установить основные пакеты...%RESET%
-        pip install flask requests
+        pip install flask
         if errorlevel 1 (
             call :print_error "Критическая ошибка установки зависимостей!"
             pause
@@ -193,7 +193,7 @@ if exist "requirements.txt" (
 ) else (
     call :print_warning "Файл requirements.txt не найден"
     call :print_info "Устанавливаем основные пакеты..."
-    pip install flask requests
+    pip install flask
     if errorlevel 1 (
         call :print_error "Не удалось установить основные пакеты!"
         pause
@@ -6,6 +6,8 @@ class LogsViewer {
         this.filter = 'all';
         this.pollInterval = null;
         this.detailTimer = null;
+        this.eventSource = null;
+        this.droppedBefore = 0;
         this.logLimit = 400;
 
         this.elements = {
@@ -125,11 +127,11 @@ class LogsViewer {
             item.innerHTML = `
                 <div class="process-header">
                     <span class="process-id">${process.command_id}</span>
-                    <span class="status-badge ${process.status}">${this.getStatusLabel(process.status)}</span>
+                    <span class="status-badge ${process.status}">${this.getStatusLabel(process.status, process.queue_position)}</span>
                 </div>
                 <div class="process-command" title="${process.command || ''}">${process.command || '—'}</div>
                 <div class="process-meta">
-                    <span>${this.formatDate(process.started_at)}</span>
+                    <span>${this.formatDate(process.started_at || process.queued_at)}</span>
                     <span>${this.formatExitCode(process)}</span>
                 </div>
             `;
@@ -144,7 +146,7 @@ class LogsViewer {
             return true;
         }
         if (filter === 'running') {
-            return process.status === 'running';
+            return this.isActive(process);
         }
         if (filter === 'finished') {
             return process.status === 'finished' || (process.status === 'stopped' && process.exit_code === 0);
@@ -174,6 +176,7 @@ class LogsViewer {
         if (this.detailTimer) {
             clearTimeout(this.detailTimer);
         }
+        this.closeStream();
 
         try {
             const response = await fetch(`/api/processes/${encodeURIComponent(commandId)}?limit=${this.logLimit}`);
@@ -183,10 +186,11 @@ class LogsViewer {
             }
 
             this.currentLogs = data.logs || [];
+            this.droppedBefore = Number(data.dropped) || 0;
             this.updateViewer(data);
 
-            if (data.status === 'running') {
-                this.detailTimer = setTimeout(() => this.loadProcessDetails(commandId), 3000);
+            if (this.isActive(data)) {
+                this.followProcess(commandId);
             }
         } catch (error) {
             console.error(error);
@@ -194,11 +198,145 @@ class LogsViewer {
         }
     }
 
+    lastLogSeq() {
+        return this.currentLogs.length ? this.currentLogs[this.currentLogs.length - 1].seq || 0 : 0;
+    }
+
+    schedulePoll(commandId) {
+        this.detailTimer = setTimeout(() => this.pollProcessLogs(commandId), 3000);
+    }
+
+    async pollProcessLogs(commandId) {
+        // Опрос по курсору: сервер отдает только строки новее последней показанной
+        try {
+            const response = await fetch(
+                `/api/processes/${encodeURIComponent(commandId)}?since=${this.lastLogSeq()}&limit=${this.logLimit}`
+            );
+            const data = await response.json();
+            if (!response.ok) {
+                throw new Error(data.error || 'Не удалось получить детали процесса');
+            }
+            if (commandId !== this.currentProcessId) {
+                return;
+            }
+
+            this.updateMeta(data);
+            this.appendLogs(data.logs || [], Number(data.dropped) || 0);
+            this.elements.count.textContent = data.log_count ?? this.currentLogs.length;
+
+            if (this.isActive(data)) {
+                this.schedulePoll(commandId);
+            } else {
+                this.fetchProcesses();
+            }
+        } catch (error) {
+            console.error(error);
+            window.showNotification(error.message, 'error');
+        }
+    }
+
+    followProcess(commandId) {
+        if (!window.EventSource) {
+            this.schedulePoll(commandId);
+            return;
+        }
+
+        // Новые строки приходят потоком событий, начиная со следующей после последней загруженной
+        const lastSeq = this.lastLogSeq();
+        const source = new EventSource(`/api/processes/${encodeURIComponent(commandId)}/events?since=${lastSeq}`);
+        let opened = false;
+        this.eventSource = source;
+
+        source.onopen = () => {
+            opened = true;
+        };
+        source.addEventListener('logs', (event) => {
+            const data = JSON.parse(event.data);
+            this.appendLogs(data.logs || [], Number(data.dropped) || 0);
+            if (this.elements.count) {
+                this.elements.count.textContent = data.log_count ?? this.currentLogs.length;
+            }
+        });
+        source.addEventListener('status', (event) => {
+            this.updateMeta(JSON.parse(event.data));
+        });
+        source.addEventListener('end', (event) => {
+            this.closeStream();
+            const data = JSON.parse(event.data);
+            if (data.status) {
+                this.updateMeta(data);
+            }
+            this.fetchProcesses();
+        });
+        source.onerror = () => {
+            if (!opened) {
+                // Поток недоступен (например, за буферизующим прокси) - возвращаемся к опросу
+                this.closeStream();
+                this.schedulePoll(commandId);
+            }
+        };
+    }
+
+    closeStream() {
+        if (this.eventSource) {
+            this.eventSource.close();
+            this.eventSource = null;
+        }
+    }
+
+    appendLogs(entries, dropped = 0) {
+        if (!entries.length) {
+            return;
+        }
+        const container = this.elements.logs;
+        const wasEmpty = this.currentLogs.length === 0;
+        if (wasEmpty) {
+            this.droppedBefore = dropped;
+        }
+        this.currentLogs.push(...entries);
+        const overflow = this.currentLogs.length - this.logLimit;
+        if (overflow > 0) {
+            this.currentLogs.splice(0, overflow);
+        }
+        if (!container) {
+            return;
+        }
+        if (wasEmpty) {
+            this.renderLogs(this.currentLogs);
+            return;
+        }
+
+        const stickToBottom = container.scrollTop + container.clientHeight >= container.scrollHeight - 20;
+        if (dropped > 0) {
+            // Вывод шел быстрее, чем мы его забирали: часть строк уже вытеснена из буфера сервера
+            container.appendChild(this.createDroppedLine(dropped));
+        }
+        entries.forEach(entry => container.appendChild(this.createLogLine(entry)));
+        while (container.children.length > this.logLimit) {
+            container.removeChild(container.firstElementChild);
+        }
+        if (stickToBottom) {
+            container.scrollTop = container.scrollHeight;
+        }
+    }
+
     updateViewer(data) {
         if (!this.elements.content || !this.elements.placeholder) {
             return;
         }
 
+        this.elements.placeholder.style.display = 'none';
+        this.elements.content.style.display = 'flex';
+        this.updateMeta(data);
+        this.elements.count.textContent = data.log_count ?? data.logs?.length ?? 0;
+        this.renderLogs(this.currentLogs);
+    }
+
+    updateMeta(data) {
+        if (!this.elements.content) {
+            return;
+        }
+
         this.elements.placeholder.style.display = 'none';
         this.elements.content.style.display = 'flex';
 
@@ -208,17 +346,14 @@ class LogsViewer {
         this.elements.finished.textContent = this.formatDate(data.finished_at);
         this.elements.exitCode.textContent = data.exit_code !== null && data.exit_code !== undefined ? data.exit_code : '—';
         this.elements.pid.textContent = data.pid || '—';
-        this.elements.count.textContent = data.log_count ?? data.logs?.length ?? 0;
 
         const statusClass = `status-badge ${data.status}`;
         this.elements.statusBadge.className = statusClass;
-        this.elements.statusBadge.textContent = this.getStatusLabel(data.status);
+        this.elements.statusBadge.textContent = this.getStatusLabel(data.status, data.queue_position);
 
         if (this.elements.stop) {
-            this.elements.stop.disabled = data.status !== 'running';
+            this.elements.stop.disabled = !this.isActive(data);
         }
-
-        this.renderLogs(this.currentLogs);
     }
 
     renderLogs(logs) {
@@ -233,19 +368,31 @@ class LogsViewer {
             return;
         }
 
-        logs.forEach(entry => {
-            const line = document.createElement('div');
-            line.className = 'log-entry';
-            line.innerHTML = `
-                <span class="log-time">${this.formatTime(entry.timestamp)}</span>
-                <span class="log-message">${this.escapeHtml(entry.message)}</span>
-            `;
-            container.appendChild(line);
-        });
+        if (this.droppedBefore > 0) {
+            container.appendChild(this.createDroppedLine(this.droppedBefore));
+        }
+        logs.forEach(entry => container.appendChild(this.createLogLine(entry)));
 
         container.scrollTop = container.scrollHeight;
     }
 
+    createDroppedLine(count) {
+        const line = document.createElement('div');
+        line.className = 'log-entry log-dropped';
+        line.textContent = `… пропущено строк: ${count}`;
+        return line;
+    }
+
+    createLogLine(entry) {
+        const line = document.createElement('div');
+        line.className = 'log-entry';
+        line.innerHTML = `
+            <span class="log-time">${this.formatTime(entry.timestamp)}</span>
+            <span class="log-message">${this.escapeHtml(entry.message)}</span>
+        `;
+        return line;
+    }
+
     async stopCurrentProcess() {
         if (!this.currentProcessId) {
             return;
@@ -312,6 +459,7 @@ class LogsViewer {
         if (this.detailTimer) {
             clearTimeout(this.detailTimer);
         }
+        this.closeStream();
         if (this.elements.content) {
             this.elements.content.style.display = 'none';
         }
@@ -319,13 +467,21 @@ class LogsViewer {
             this.elements.placeholder.style.display = 'flex';
         }
         this.currentLogs = [];
+        this.droppedBefore = 0;
         this.renderProcessList();
     }
 
-    getStatusLabel(status) {
+    isActive(process) {
+        // Ожидающий в очереди процесс еще запустится, его можно снять
+        return process.status === 'running' || process.status === 'queued';
+    }
+
+    getStatusLabel(status, position = null) {
         switch (status) {
             case 'running':
                 return 'Выполняется';
+            case 'queued':
+                return position ? `В очереди (#${position})` : 'В очереди';
             case 'finished':
                 return 'Завершено';
             case 'failed':
@@ -341,6 +497,9 @@ class LogsViewer {
         if (process.status === 'running') {
             return 'В процессе';
         }
+        if (process.status === 'queued') {
+            return 'Ожидает запуска';
+        }
         if (process.exit_code === null || process.exit_code === undefined) {
             return '—';
         }
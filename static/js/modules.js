@@ -181,7 +181,10 @@ class ModulesManager {
         })
         .then(response => response.json())
         .then(data => {
-            if (data.success) {
+            if (data.success && data.status === 'queued') {
+                this.showSuccess(`Модуль 2gis comment поставлен в очередь (#${data.queue_position})`);
+                this.updateStatusInfo('queued', 'В очереди...');
+            } else if (data.success) {
                 this.showSuccess('Модуль 2gis comment запущен');
                 this.updateStatusInfo('running', 'Выполняется...');
             } else {
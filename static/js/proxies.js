@@ -1,15 +1,30 @@
 /**
- * JavaScript для страницы тестирования прокси (HTTP polling версия)
+ * JavaScript для страницы тестирования прокси
+ *
+ * Во время теста страница получает поток событий /api/proxies/events, а если
+ * он недоступен - опрашивает /api/proxies/results с курсором since. В обоих
+ * случаях дорисовываются только новые результаты, без полных списков.
  */
 
 class ProxyTester {
     constructor() {
         this.isTestingActive = false;
         this.progressInterval = null;
+        this.eventSource = null;
+        this.streamFailed = false;
         this.currentResults = {
             working_proxies: [],
             unique_proxies: [],
+            working_details: [],
+            unique_details: [],
         };
+        this.latencyStats = null;
+        this.resultsSeq = 0;
+        this.jobId = null;
+        this.uniqueByIp = new Map();
+        this.uniqueElements = new Map();
+        this.pollInFlight = false;
+        this.stopRequested = false;
         this.exportedFilename = null;
         this.syncCommand = null;
         this.stateStorageKey = 'cp_proxy_tester_state';
@@ -23,11 +38,23 @@ class ProxyTester {
     restorePersistedState() {
         const rawState = localStorage.getItem(this.stateStorageKey);
         const proxyInput = document.getElementById('proxyInput');
+        const probeUrlInput = document.getElementById('probeUrl');
 
         if (proxyInput) {
             proxyInput.addEventListener('input', () => this.persistState());
         }
 
+        if (probeUrlInput) {
+            probeUrlInput.addEventListener('input', () => this.persistState());
+        }
+
+        ['adaptiveConcurrency', 'tcpPrecheck', 'targetUnique', 'probeOrder'].forEach((id) => {
+            const element = document.getElementById(id);
+            if (element) {
+                element.addEventListener('change', () => this.persistState());
+            }
+        });
+
         if (!rawState) {
             this.setExportedFilename(null, { skipPersist: true });
             return;
@@ -40,10 +67,38 @@ class ProxyTester {
                 proxyInput.value = state.input;
             }
 
+            if (probeUrlInput && typeof state.probeUrl === 'string') {
+                probeUrlInput.value = state.probeUrl;
+            }
+
+            const adaptiveInput = document.getElementById('adaptiveConcurrency');
+            if (adaptiveInput && typeof state.adaptive === 'boolean') {
+                adaptiveInput.checked = state.adaptive;
+            }
+
+            const precheckInput = document.getElementById('tcpPrecheck');
+            if (precheckInput && typeof state.precheck === 'boolean') {
+                precheckInput.checked = state.precheck;
+            }
+
+            const targetUniqueInput = document.getElementById('targetUnique');
+            if (targetUniqueInput && typeof state.targetUnique === 'string') {
+                targetUniqueInput.value = state.targetUnique;
+            }
+
+            const orderSelect = document.getElementById('probeOrder');
+            if (orderSelect && typeof state.order === 'string') {
+                orderSelect.value = state.order;
+            }
+
             if (typeof state.activeTab === 'string') {
                 this.activeTab = state.activeTab;
             }
 
+            if (typeof state.jobId === 'string') {
+                this.jobId = state.jobId;
+            }
+
             if (state.exportedFilename) {
                 this.setExportedFilename(state.exportedFilename, { skipPersist: true });
             } else {
@@ -55,6 +110,32 @@ class ProxyTester {
         }
     }
 
+    persistState() {
+        const proxyInput = document.getElementById('proxyInput');
+        const probeUrlInput = document.getElementById('probeUrl');
+        const state = {
+            input: proxyInput ? proxyInput.value : '',
+            probeUrl: probeUrlInput ? probeUrlInput.value : '',
+            adaptive: Boolean(document.getElementById('adaptiveConcurrency')?.checked),
+            precheck: Boolean(document.getElementById('tcpPrecheck')?.checked),
+            targetUnique: document.getElementById('targetUnique')?.value || '',
+            order: document.getElementById('probeOrder')?.value || 'input',
+            activeTab: this.activeTab,
+            exportedFilename: this.exportedFilename,
+            jobId: this.jobId,
+        };
+
+        try {
+            localStorage.setItem(this.stateStorageKey, JSON.stringify(state));
+        } catch (error) {
+            console.warn('Не удалось сохранить состояние proxy tester:', error);
+        }
+    }
+
+    jobQuery(prefix = '&') {
+        return this.jobId ? `${prefix}job_id=${encodeURIComponent(this.jobId)}` : '';
+    }
+
     setupEventListeners() {
         const testButton = document.getElementById('testProxies');
         const stopButton = document.getElementById('stopTesting');
@@ -77,6 +158,10 @@ class ProxyTester {
                 if (proxyInput) {
                     proxyInput.value = '';
                 }
+                const fileInput = document.getElementById('proxyFile');
+                if (fileInput) {
+                    fileInput.value = '';
+                }
                 this.hideResults();
                 this.persistState();
             });
@@ -94,6 +179,11 @@ class ProxyTester {
             syncButton.addEventListener('click', () => this.syncToDatabase());
         }
 
+        const downloadButton = document.getElementById('downloadResults');
+        if (downloadButton) {
+            downloadButton.addEventListener('click', () => this.downloadResults());
+        }
+
         document.querySelectorAll('.tab-btn').forEach((btn) => {
             btn.addEventListener('click', (event) => {
                 const tabName = event.currentTarget.dataset.tab;
@@ -113,26 +203,68 @@ class ProxyTester {
         }
 
         const proxies = proxyInput.value.trim();
+        const fileInput = document.getElementById('proxyFile');
+        const proxyFile = fileInput && fileInput.files.length ? fileInput.files[0] : null;
 
-        if (!proxies) {
+        if (!proxies && !proxyFile) {
             this.showNotification('Введите список прокси для тестирования', 'error');
             return;
         }
 
+        const probeUrlInput = document.getElementById('probeUrl');
+        const payload = {};
+        if (probeUrlInput && probeUrlInput.value.trim()) {
+            payload.probe_url = probeUrlInput.value.trim();
+        }
+        const adaptiveInput = document.getElementById('adaptiveConcurrency');
+        if (adaptiveInput) {
+            payload.adaptive = adaptiveInput.checked;
+        }
+        const precheckInput = document.getElementById('tcpPrecheck');
+        if (precheckInput) {
+            payload.precheck = precheckInput.checked;
+        }
+        const targetUniqueInput = document.getElementById('targetUnique');
+        const targetUnique = targetUniqueInput ? parseInt(targetUniqueInput.value, 10) : NaN;
+        if (targetUnique > 0) {
+            payload.target_unique = targetUnique;
+        }
+        const orderSelect = document.getElementById('probeOrder');
+        if (orderSelect && orderSelect.value) {
+            payload.order = orderSelect.value;
+        }
+
         try {
-            const response = await fetch('/api/proxies/test', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ proxies }),
-            });
+            let response;
+            if (proxyFile) {
+                // Файл уходит сырым телом, сервер проверяет его по мере получения
+                const params = new URLSearchParams(Object.entries(payload).map(([key, value]) => [key, String(value)]));
+                this.showNotification(`Загрузка файла ${proxyFile.name}...`, 'info');
+                response = await fetch(`/api/proxies/test/upload?${params}`, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'text/plain',
+                    },
+                    body: proxyFile,
+                });
+            } else {
+                payload.proxies = proxies;
+                response = await fetch('/api/proxies/test', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                    },
+                    body: JSON.stringify(payload),
+                });
+            }
 
             const data = await response.json();
 
             if (response.ok && data.success) {
                 this.isTestingActive = true;
+                this.stopRequested = false;
                 this.showTestingUI();
+                this.jobId = data.job_id || null;
                 this.setExportedFilename(null);
                 this.showNotification(data.message || 'Тестирование запущено', 'success');
                 this.startProgressPolling();
@@ -149,16 +281,23 @@ class ProxyTester {
         try {
             const response = await fetch('/api/proxies/stop', {
                 method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({ job_id: this.jobId }),
             });
 
             const data = await response.json();
 
             if (response.ok && data.success) {
-                this.isTestingActive = false;
-                this.stopProgressPolling();
-                this.hideTestingUI();
+                // Опрос продолжается до фактического завершения теста,
+                // чтобы забрать последние результаты по курсору
+                this.stopRequested = true;
                 this.showNotification('Тестирование остановлено', 'info');
-                await this.loadResults({ restoreTab: true });
+                this.startProgressPolling();
+                if (!this.eventSource) {
+                    await this.pollResults();
+                }
             } else {
                 this.showNotification(data.error || 'Не удалось остановить тестирование', 'error');
             }
@@ -217,37 +356,224 @@ class ProxyTester {
     }
 
     startProgressPolling() {
-        if (this.progressInterval) {
+        if (this.progressInterval || this.eventSource) {
             return;
         }
 
-        this.progressInterval = setInterval(async () => {
-            try {
-                const response = await fetch('/api/proxies/progress');
+        if (window.EventSource && this.jobId && !this.streamFailed) {
+            this.startEventStream();
+            return;
+        }
+
+        this.progressInterval = setInterval(() => this.pollResults(), 1000);
+        this.pollResults();
+    }
+
+    startEventStream() {
+        const source = new EventSource(`/api/proxies/events?since=${this.resultsSeq}${this.jobQuery()}`);
+        let opened = false;
+        this.eventSource = source;
+
+        source.onopen = () => {
+            opened = true;
+        };
+        source.onmessage = (event) => {
+            const data = JSON.parse(event.data);
+            this.applyDelta(data);
+            if (data.has_more) {
+                return;
+            }
+            this.updateProgress(data.progress);
+            if (!data.is_running) {
+                // Финальное сообщение: закрываем поток, чтобы браузер не переподключался
+                this.closeEventStream();
+                if (this.isTestingActive) {
+                    this.finishTesting(data);
+                }
+            }
+        };
+        source.onerror = () => {
+            if (!opened) {
+                // Поток событий недоступен - до перезагрузки страницы используем опрос
+                this.streamFailed = true;
+                this.closeEventStream();
+                this.startProgressPolling();
+            }
+        };
+    }
+
+    closeEventStream() {
+        if (this.eventSource) {
+            this.eventSource.close();
+            this.eventSource = null;
+        }
+    }
+
+    async pollResults() {
+        if (this.pollInFlight) {
+            return;
+        }
+
+        this.pollInFlight = true;
+        try {
+            let data = null;
+            do {
+                const response = await fetch(`/api/proxies/results?since=${this.resultsSeq}${this.jobQuery()}`);
                 if (!response.ok) {
                     return;
                 }
 
-                const data = await response.json();
-                this.updateProgress(data);
-
-                if (!data.is_running && this.isTestingActive) {
-                    this.isTestingActive = false;
-                    this.stopProgressPolling();
-                    this.hideTestingUI();
-                    await this.loadResults({
-                        autoSwitchTab: 'unique',
-                        showNoResults: true,
-                    });
-                    this.showNotification('Тестирование завершено!', 'success');
-                }
-            } catch (error) {
-                console.error('Error polling progress:', error);
+                data = await response.json();
+                this.applyDelta(data);
+            } while (data.has_more);
+
+            this.updateProgress(data.progress);
+
+            if (!data.is_running && this.isTestingActive) {
+                this.finishTesting(data);
             }
-        }, 1000);
+        } catch (error) {
+            console.error('Error polling progress:', error);
+        } finally {
+            this.pollInFlight = false;
+        }
+    }
+
+    finishTesting(data = {}) {
+        this.isTestingActive = false;
+        this.stopProgressPolling();
+        this.hideTestingUI();
+
+        this.latencyStats = data.latency || null;
+        this.updateLatencyStats();
+        this.sortResultsByLatency();
+
+        const hasAnyResults = this.currentResults.working_details.length > 0;
+        this.displayResults({
+            autoSwitchTab: this.stopRequested ? null : 'unique',
+            restoreTab: this.stopRequested,
+            showNoResults: !hasAnyResults,
+        });
+        this.setExportedFilename(data.exported_filename || null, { skipPersist: true });
+        this.persistState();
+
+        if (data.progress && data.progress.target_reached) {
+            this.showNotification(`Найдено ${data.progress.unique_ips} уникальных IP, тестирование остановлено`, 'success');
+        } else if (!this.stopRequested) {
+            this.showNotification('Тестирование завершено!', 'success');
+        }
+        this.stopRequested = false;
+    }
+
+    resetResultsState() {
+        this.currentResults = {
+            working_proxies: [],
+            unique_proxies: [],
+            working_details: [],
+            unique_details: [],
+        };
+        this.resultsSeq = 0;
+        this.uniqueByIp = new Map();
+        this.uniqueElements = new Map();
+        this.latencyStats = null;
+        this.updateLatencyStats();
+    }
+
+    applyDelta(data = {}) {
+        if (data.job_id && data.job_id !== this.jobId) {
+            // Опрос без job_id вернул другую (последнюю) задачу - начинаем с ее начала
+            if (this.resultsSeq > 0) {
+                this.hideResults();
+            }
+            this.jobId = data.job_id;
+        }
+        // Поток и опрос могут вернуть одно и то же окно - уже примененные события пропускаем
+        const appliedSeq = this.resultsSeq;
+        const isNew = (item) => !item.seq || Number(item.seq) > appliedSeq;
+        this.resultsSeq = Math.max(appliedSeq, Number(data.seq) || 0);
+
+        const newWorking = (data.working || []).filter(isNew).map((item) => this.normalizeResult(item));
+        newWorking.forEach((result) => {
+            this.currentResults.working_details.push(result);
+            this.currentResults.working_proxies.push(result.proxy);
+        });
+
+        const changedUnique = (data.unique || []).filter(isNew).map((item) => this.normalizeResult(item));
+        if (changedUnique.length) {
+            changedUnique.forEach((result) => this.uniqueByIp.set(result.ip, result));
+            this.currentResults.unique_details = Array.from(this.uniqueByIp.values());
+            this.currentResults.unique_proxies = this.currentResults.unique_details.map((item) => item.proxy);
+        }
+
+        if (newWorking.length || changedUnique.length) {
+            this.renderDelta(newWorking, changedUnique);
+        }
+    }
+
+    renderDelta(newWorking, changedUnique) {
+        const resultsSection = document.querySelector('.results-section');
+        const noResultsBlock = document.getElementById('noResults');
+        const workingList = document.getElementById('workingProxies');
+        const uniqueList = document.getElementById('uniqueProxies');
+        const workingCount = document.getElementById('workingProxiesCount');
+        const uniqueCount = document.getElementById('uniqueProxiesCount');
+        const firstResults = resultsSection && resultsSection.style.display === 'none';
+
+        if (resultsSection) {
+            resultsSection.style.display = 'block';
+        }
+        if (noResultsBlock) {
+            noResultsBlock.style.display = 'none';
+        }
+
+        if (workingList && newWorking.length) {
+            if (this.currentResults.working_details.length === newWorking.length) {
+                workingList.innerHTML = '';
+            }
+            workingList.insertAdjacentHTML('beforeend', newWorking.map((result) => this.renderProxyItem(result)).join(''));
+        }
+
+        if (uniqueList && changedUnique.length) {
+            if (!this.uniqueElements.size) {
+                uniqueList.innerHTML = '';
+            }
+            changedUnique.forEach((result) => {
+                const wrapper = document.createElement('div');
+                wrapper.innerHTML = this.renderProxyItem(result);
+                const element = wrapper.firstElementChild;
+                const existing = this.uniqueElements.get(result.ip);
+                if (existing) {
+                    existing.replaceWith(element);
+                } else {
+                    uniqueList.appendChild(element);
+                }
+                this.uniqueElements.set(result.ip, element);
+            });
+        }
+
+        if (workingCount) workingCount.textContent = this.currentResults.working_details.length;
+        if (uniqueCount) uniqueCount.textContent = this.currentResults.unique_details.length;
+
+        if (firstResults) {
+            this.switchTab(this.activeTab || 'unique', { skipSave: true });
+        }
+    }
+
+    sortResultsByLatency() {
+        const byLatency = (a, b) => {
+            const left = a.total_ms === null || a.total_ms === undefined ? Infinity : a.total_ms;
+            const right = b.total_ms === null || b.total_ms === undefined ? Infinity : b.total_ms;
+            return left - right;
+        };
+
+        this.currentResults.working_details.sort(byLatency);
+        this.currentResults.unique_details.sort(byLatency);
+        this.currentResults.working_proxies = this.currentResults.working_details.map((item) => item.proxy);
+        this.currentResults.unique_proxies = this.currentResults.unique_details.map((item) => item.proxy);
     }
 
     stopProgressPolling() {
+        this.closeEventStream();
         if (this.progressInterval) {
             clearInterval(this.progressInterval);
             this.progressInterval = null;
@@ -262,6 +588,11 @@ class ProxyTester {
             working: document.getElementById('workingCount'),
             unique: document.getElementById('uniqueCount'),
             failed: document.getElementById('failedCount'),
+            skipped: document.getElementById('skippedCount'),
+            cached: document.getElementById('cachedCount'),
+            concurrency: document.getElementById('concurrencyLevel'),
+            precheck: document.getElementById('precheckCount'),
+            dns: document.getElementById('dnsStats'),
         };
 
         const total = Number(data.total) || 0;
@@ -282,13 +613,39 @@ class ProxyTester {
         if (statsElements.working) statsElements.working.textContent = Number(data.working) || 0;
         if (statsElements.unique) statsElements.unique.textContent = Number(data.unique_ips) || 0;
         if (statsElements.failed) statsElements.failed.textContent = Number(data.failed) || 0;
+        if (statsElements.cached) statsElements.cached.textContent = Number(data.cached) || 0;
+        if (statsElements.skipped) {
+            statsElements.skipped.textContent = `${Number(data.duplicates) || 0} / ${Number(data.invalid) || 0}`;
+        }
+        if (statsElements.precheck) {
+            statsElements.precheck.textContent = data.precheck
+                ? `${Number(data.precheck_passed) || 0} / ${Number(data.precheck_failed) || 0}`
+                : '—';
+        }
+        if (statsElements.dns) {
+            const lookups = Number(data.dns_lookups) || 0;
+            statsElements.dns.textContent = lookups || data.dns_failed
+                ? `${lookups} / ${Number(data.dns_failed) || 0} (${Number(data.dns_ms) || 0} мс)`
+                : '—';
+        }
+        if (statsElements.concurrency) {
+            const limit = Number(data.concurrency_limit) || 0;
+            statsElements.concurrency.textContent = data.adaptive
+                ? `${limit} из ${Number(data.concurrency) || 0}`
+                : (limit || '—');
+        }
     }
 
     async loadResults(options = {}) {
         const { initial = false, autoSwitchTab = null, showNoResults = false, restoreTab = false } = options;
 
         try {
-            const response = await fetch('/api/proxies/state');
+            let response = await fetch(`/api/proxies/state?details=1&sort=latency${this.jobQuery()}`);
+            if (response.status === 404 && this.jobId) {
+                // Задача уже удалена из истории сервера - показываем последнюю
+                this.jobId = null;
+                response = await fetch('/api/proxies/state?details=1&sort=latency');
+            }
             if (!response.ok) {
                 throw new Error('Bad response');
             }
@@ -311,27 +668,36 @@ class ProxyTester {
     applyState(data = {}, options = {}) {
         const { initial = false, autoSwitchTab = null, showNoResults = false, restoreTab = false } = options;
 
+        this.jobId = data.job_id || null;
+
         if (data.is_running) {
+            // Результаты идущего теста подтягиваются по курсору с начала
             this.isTestingActive = true;
             this.showTestingUI();
             this.startProgressPolling();
-        } else {
-            this.isTestingActive = false;
-            this.hideTestingUI();
-            this.stopProgressPolling();
+            return;
         }
 
+        this.isTestingActive = false;
+        this.hideTestingUI();
+        this.stopProgressPolling();
+
         if (data.progress) {
             this.updateProgress(data.progress);
         }
 
-        const working = Array.isArray(data.working) ? data.working : [];
-        const unique = Array.isArray(data.unique) ? data.unique : [];
+        const working = Array.isArray(data.working) ? data.working.map((item) => this.normalizeResult(item)) : [];
+        const unique = Array.isArray(data.unique) ? data.unique.map((item) => this.normalizeResult(item)) : [];
 
         this.currentResults = {
-            working_proxies: working,
-            unique_proxies: unique,
+            working_proxies: working.map((item) => item.proxy),
+            unique_proxies: unique.map((item) => item.proxy),
+            working_details: working,
+            unique_details: unique,
         };
+        this.uniqueByIp = new Map(unique.map((item) => [item.ip, item]));
+        this.latencyStats = data.latency || null;
+        this.updateLatencyStats();
 
         const hasAnyResults = working.length > 0 || unique.length > 0;
 
@@ -347,6 +713,35 @@ class ProxyTester {
         this.persistState();
     }
 
+    normalizeResult(item) {
+        if (item && typeof item === 'object') {
+            return item;
+        }
+        return { proxy: String(item), ip: null, connect_ms: null, total_ms: null };
+    }
+
+    formatLatency(value) {
+        return value === null || value === undefined ? '—' : `${Math.round(value)} ms`;
+    }
+
+    updateLatencyStats() {
+        const latencyElement = document.getElementById('latencyStats');
+        if (!latencyElement) {
+            return;
+        }
+
+        const total = this.latencyStats?.total_ms || {};
+        latencyElement.textContent = total.p50 === null || total.p50 === undefined
+            ? '—'
+            : `${this.formatLatency(total.p50)} / ${this.formatLatency(total.p90)} / ${this.formatLatency(total.p99)}`;
+    }
+
+    renderProxyItem(result) {
+        const title = result.ip ? ` title="IP: ${result.ip}"` : '';
+        return `<div class="proxy-item"${title}><span class="proxy-address">${result.proxy}</span>`
+            + `<span class="proxy-status">${this.formatLatency(result.total_ms)}</span></div>`;
+    }
+
     displayResults(options = {}) {
         const { autoSwitchTab = null, restoreTab = false, showNoResults = false } = options;
 
@@ -357,8 +752,8 @@ class ProxyTester {
         const workingCount = document.getElementById('workingProxiesCount');
         const uniqueCount = document.getElementById('uniqueProxiesCount');
 
-        const working = this.currentResults?.working_proxies || [];
-        const unique = this.currentResults?.unique_proxies || [];
+        const working = this.currentResults?.working_details || [];
+        const unique = this.currentResults?.unique_details || [];
         const hasResults = working.length > 0 || unique.length > 0;
         const shouldShow = hasResults || showNoResults;
 
@@ -388,14 +783,18 @@ class ProxyTester {
         if (hasResults) {
             if (workingList) {
                 workingList.innerHTML = working
-                    .map((proxy) => `<div class="proxy-item">${proxy}</div>`)
+                    .map((result) => this.renderProxyItem(result))
                     .join('');
             }
 
             if (uniqueList) {
                 uniqueList.innerHTML = unique
-                    .map((proxy) => `<div class="proxy-item">${proxy}</div>`)
+                    .map((result) => this.renderProxyItem(result))
                     .join('');
+                this.uniqueElements = new Map();
+                Array.from(uniqueList.children).forEach((element, index) => {
+                    this.uniqueElements.set(unique[index].ip, element);
+                });
             }
         } else {
             if (workingList) {
@@ -437,10 +836,7 @@ class ProxyTester {
             noResultsBlock.style.display = 'none';
         }
         if (!preserveState) {
-            this.currentResults = {
-                working_proxies: [],
-                unique_proxies: [],
-            };
+            this.resetResultsState();
             if (workingList) workingList.innerHTML = '';
             if (uniqueList) uniqueList.innerHTML = '';
             if (workingCount) workingCount.textContent = '0';
@@ -457,8 +853,7 @@ class ProxyTester {
         }
 
         try {
-            await navigator.clipboard.writeText(uniqueProxies.join('
-'));
+            await navigator.clipboard.writeText(uniqueProxies.join('\n'));
             this.showNotification(`Скопировано ${uniqueProxies.length} уникальных прокси`, 'success');
         } catch (error) {
             console.error('Error copying to clipboard:', error);
@@ -479,6 +874,7 @@ class ProxyTester {
                 headers: {
                     'Content-Type': 'application/json',
                 },
+                body: JSON.stringify({ job_id: this.jobId }),
             });
 
             const data = await response.json();
@@ -505,6 +901,29 @@ class ProxyTester {
         }
     }
 
+    downloadResults() {
+        if (!this.jobId) {
+            this.showNotification('Нет результатов для скачивания', 'error');
+            return;
+        }
+
+        const formatSelect = document.getElementById('downloadFormat');
+        const activeTab = document.querySelector('.tab-btn.active');
+        const params = new URLSearchParams({
+            job_id: this.jobId,
+            kind: activeTab?.dataset.tab === 'working' ? 'working' : 'unique',
+            format: formatSelect ? formatSelect.value : 'tsv',
+        });
+
+        // Файл отдается потоком, браузер сохраняет его по Content-Disposition
+        const link = document.createElement('a');
+        link.href = `/api/proxies/download?${params}`;
+        link.download = '';
+        document.body.appendChild(link);
+        link.click();
+        link.remove();
+    }
+
     setExportedFilename(filename, options = {}) {
         const { skipPersist = false } = options;
         this.exportedFilename = filename || null;
@@ -565,9 +984,12 @@ class ProxyTester {
                         syncButton.setAttribute('title', commandHint);
                     }
                 }
+                const started = data.status === 'queued'
+                    ? `Синхронизация поставлена в очередь (#${data.queue_position})`
+                    : 'Синхронизация запущена';
                 const message = commandHint
-                    ? `Синхронизация запущена: ${commandHint}`
-                    : 'Синхронизация запущена. Проверяйте раздел логов.';
+                    ? `${started}: ${commandHint}`
+                    : `${started}. Проверяйте раздел логов.`;
                 this.showNotification(message, 'success');
             } else {
                 this.showNotification(data.error || 'Ошибка синхронизации', 'error');
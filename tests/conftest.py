@@ -0,0 +1,10 @@
+"""Общая настройка тестов: app.py пишет файлы во временную директорию"""
+
+import os
+import sys
+import tempfile
+
+# FILES_PATH вычисляется при импорте app, поэтому переменная задается до него
+os.environ.setdefault('CRYPTO_PLAYGROUND_FILES', tempfile.mkdtemp(prefix='crypto_playground_tests_'))
+os.environ.setdefault('PROCESS_OUTPUT_ECHO', '0')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
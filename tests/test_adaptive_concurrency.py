@@ -0,0 +1,74 @@
+"""AIMD-регулятор числа одновременных проверок"""
+
+import app
+
+FAST = {'connect_ms': 5, 'total_ms': 100}
+SLOW = {'connect_ms': 5, 'total_ms': 400}
+
+
+def feed(controller, outcome, count, timings=None):
+    for _ in range(count):
+        limit = controller.observe(outcome, timings)
+    return limit
+
+
+def window(controller):
+    return max(app.ADAPTIVE_MIN_SAMPLES, controller.limit // 4)
+
+
+def test_slow_start_doubles_until_max():
+    controller = app.AdaptiveConcurrency(10, 100)
+    assert controller.limit == 10
+
+    assert feed(controller, 'working', window(controller), FAST) == 20
+    assert feed(controller, 'working', window(controller), FAST) == 40
+    assert feed(controller, 'working', window(controller), FAST) == 80
+    assert feed(controller, 'working', window(controller), FAST) == 100
+    assert feed(controller, 'working', window(controller), FAST) == 100
+
+
+def test_limit_changes_only_after_a_full_window():
+    controller = app.AdaptiveConcurrency(10, 100)
+    assert feed(controller, 'working', app.ADAPTIVE_MIN_SAMPLES - 1, FAST) == 10
+    assert controller.observe('working', FAST) == 20
+
+
+def test_timeouts_halve_and_switch_to_additive_increase():
+    controller = app.AdaptiveConcurrency(10, 100, initial=80)
+    step = controller.step
+
+    feed(controller, 'working', window(controller) // 2, FAST)
+    assert feed(controller, 'timeout', window(controller) - window(controller) // 2) == 40
+    assert not controller.slow_start
+
+    assert feed(controller, 'working', window(controller), FAST) == 40 + step
+    assert feed(controller, 'working', window(controller), FAST) == 40 + 2 * step
+
+
+def test_local_errors_signal_congestion():
+    controller = app.AdaptiveConcurrency(10, 100, initial=40)
+    errors = int(window(controller) * app.ADAPTIVE_ERROR_RATE) + 1
+    feed(controller, 'error', errors)
+    assert feed(controller, 'failed', window(controller) - errors) == 20
+
+
+def test_latency_growth_signals_congestion():
+    controller = app.AdaptiveConcurrency(10, 100, initial=40)
+    assert feed(controller, 'working', window(controller), FAST) == 80
+    assert controller.baseline_ms == 100
+
+    assert feed(controller, 'working', window(controller), SLOW) == 40
+    # Медиана растет, но базовая задержка остается лучшей из виденных
+    assert controller.baseline_ms == 100
+
+
+def test_limit_never_drops_below_minimum():
+    controller = app.AdaptiveConcurrency(10, 100, initial=16)
+    for _ in range(5):
+        feed(controller, 'timeout', window(controller))
+    assert controller.limit == 10
+
+
+def test_bounds_are_normalised():
+    controller = app.AdaptiveConcurrency(50, 20)
+    assert controller.min_limit == 20 and controller.max_limit == 20 and controller.limit == 20
@@ -0,0 +1,160 @@
+"""Конвейер проверки: общий бюджет, ограничение скорости и стадии в потоках"""
+
+import queue
+import socket
+import threading
+import time
+
+import app
+
+
+def drain(entries, timeout=5):
+    """Готовые записи генератора без _ENTRY_PENDING"""
+    deadline = time.monotonic() + timeout
+    result = []
+    for entry in entries:
+        if entry is app._ENTRY_PENDING:
+            assert time.monotonic() < deadline, 'stage did not finish in time'
+            time.sleep(0.005)
+            continue
+        result.append(entry)
+    return result
+
+
+def test_budget_fair_share_and_limit():
+    budget = app.ProbeBudget(10)
+    assert budget.fair_share() == 10
+    budget.register()
+    budget.register()
+    budget.register()
+    assert budget.fair_share() == 3
+    budget.unregister()
+    assert budget.fair_share() == 5
+
+    assert all(budget.try_acquire() for _ in range(10))
+    assert not budget.try_acquire()
+    budget.release(4)
+    assert budget.snapshot() == {'limit': 10, 'in_use': 6, 'jobs': 2}
+    budget.release(100)
+    assert budget.snapshot()['in_use'] == 0
+
+
+def test_concurrent_jobs_stay_within_their_fair_share(monkeypatch):
+    lock = threading.Lock()
+    in_flight = {'a': 0, 'b': 0}
+    peak = {'a': 0, 'b': 0, 'total': 0}
+
+    def fake_probe(proxy, timeout=10, probe_url=None, cancelled=None):
+        job = proxy.split('//')[1][0]
+        with lock:
+            in_flight[job] += 1
+            peak[job] = max(peak[job], in_flight[job])
+            peak['total'] = max(peak['total'], in_flight['a'] + in_flight['b'])
+        time.sleep(0.01)
+        with lock:
+            in_flight[job] -= 1
+        return True, '10.0.0.1', {'connect_ms': 1, 'total_ms': 10}, 'working'
+
+    monkeypatch.setattr(app, 'probe_proxy', fake_probe)
+    budget = app.ProbeBudget(8)
+    budget.register()
+    budget.register()
+    done = {'a': 0, 'b': 0}
+
+    def run(job):
+        def handle_result(entry, is_working, ip, timings):
+            done[job] += 1
+
+        entries = [(f'http://{job}{number}:1', f'{job}{number}:1') for number in range(60)]
+        app._run_probes_threaded(entries, handle_result, lambda: False, 50, budget=budget)
+
+    threads = [threading.Thread(target=run, args=(job,)) for job in ('a', 'b')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert done == {'a': 60, 'b': 60}
+    assert peak['a'] <= 4 and peak['b'] <= 4 and peak['total'] <= 8
+    assert budget.snapshot()['in_use'] == 0
+
+
+def test_rate_limited_entries_spaces_out_entries():
+    entries = [('p1', 'p1'), app._ENTRY_PENDING, ('p2', 'p2'), ('p3', 'p3'), ('p4', 'p4')]
+    started = time.monotonic()
+    passed = []
+    pending = 0
+    for entry in app.rate_limited_entries(iter(entries), rate=50):
+        if entry is app._ENTRY_PENDING:
+            pending += 1
+            continue
+        passed.append((entry[0], time.monotonic() - started))
+
+    assert [name for name, _ in passed] == ['p1', 'p2', 'p3', 'p4']
+    # Первая запись сразу, дальше не чаще раза в 1/50 секунды
+    assert passed[0][1] < 0.02
+    assert passed[-1][1] >= 3 / 50 - 0.005
+    assert pending > 1
+
+
+def test_drain_stage_yields_pending_until_output_is_ready():
+    release = threading.Event()
+    output = queue.Queue()
+    stop_event = threading.Event()
+    seen = []
+
+    def stage(items):
+        release.wait(2)
+        for item in items:
+            output.put(item)
+
+    generator = app._drain_stage(stage, (['a', 'b'],), output, stop_event, on_entry=seen.append)
+    assert next(generator) is app._ENTRY_PENDING
+    release.set()
+
+    assert drain(generator) == ['a', 'b']
+    assert seen == ['a', 'b']
+    assert stop_event.is_set()
+
+
+def test_closing_drain_stage_stops_the_stage_thread():
+    output = queue.Queue()
+    stop_event = threading.Event()
+    stopped = threading.Event()
+
+    def stage():
+        stop_event.wait(5)
+        stopped.set()
+
+    generator = app._drain_stage(stage, (), output, stop_event)
+    assert next(generator) is app._ENTRY_PENDING
+    generator.close()
+
+    assert stopped.wait(2)
+
+
+def test_precheck_passes_only_reachable_proxies():
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(16)
+    open_port = listener.getsockname()[1]
+    closed = socket.socket()
+    closed.bind(('127.0.0.1', 0))
+    closed_port = closed.getsockname()[1]
+    closed.close()
+
+    results = []
+    entries = [
+        (f'http://127.0.0.1:{open_port}', 'open'),
+        (f'http://127.0.0.1:{closed_port}', 'closed'),
+        ('http://:1', 'no-host'),
+    ]
+    try:
+        passed = drain(app.precheck_entries(
+            iter(entries), lambda entry, reachable: results.append((entry[1], reachable)), timeout=1
+        ))
+    finally:
+        listener.close()
+
+    assert [entry[1] for entry in passed] == ['open']
+    assert sorted(results) == [('closed', False), ('no-host', False), ('open', True)]
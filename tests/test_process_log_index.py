@@ -0,0 +1,103 @@
+"""Полнотекстовый поиск по логам процессов"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def index(tmp_path):
+    # Фикстуры используют фиксированные даты, поэтому чистку по возрасту выключаем
+    return app.ProcessLogIndex(str(tmp_path / 'logs.sqlite3'), retention_days=0)
+
+
+def add_lines(index, command_id, messages, timestamp='2026-05-01T12:00:00'):
+    index.extend(command_id, [
+        {'seq': seq, 'timestamp': timestamp, 'message': message}
+        for seq, message in enumerate(messages, start=1)
+    ])
+    assert index.flush()
+
+
+def messages(results):
+    return [row['message'] for row in results]
+
+
+def test_database_is_opened_on_first_use(tmp_path):
+    db_path = tmp_path / 'lazy.sqlite3'
+    index = app.ProcessLogIndex(str(db_path))
+    assert not db_path.exists()
+
+    assert index.search('anything') == ([], False)
+    assert db_path.exists()
+
+
+def test_substring_search_is_case_insensitive_and_newest_first(index):
+    add_lines(index, 'a', ['account 1 ok', 'account 2 FAILED: captcha timeout', 'account 3 ok'])
+    add_lines(index, 'b', ['account 9 failed: Captcha error'])
+
+    results, has_more = index.search('captcha')
+    assert messages(results) == ['account 9 failed: Captcha error', 'account 2 FAILED: captcha timeout']
+    assert not has_more
+    assert messages(index.search('captcha', command_id='a')[0]) == ['account 2 FAILED: captcha timeout']
+
+
+@pytest.mark.parametrize('fts', [True, False])
+def test_short_and_wildcard_substrings_are_literal(index, fts, monkeypatch):
+    if not fts:
+        # Как на SQLite без FTS5/trigram: поиск идет LIKE по основной таблице
+        monkeypatch.setattr(index, '_create_fts', lambda conn: False)
+    add_lines(index, 'a', ['100%_done', '100 done', 'ok'])
+
+    assert messages(index.search('%_')[0]) == ['100%_done']
+    assert messages(index.search('ok')[0]) == ['ok']
+    assert messages(index.search('100%_d')[0]) == ['100%_done']
+
+
+def test_regex_and_time_range_filters(index):
+    add_lines(index, 'old', ['error code 500'], timestamp='2026-01-01T00:00:00')
+    add_lines(index, 'new', ['error code 502', 'error code abc'], timestamp='2026-06-01T00:00:00')
+
+    assert messages(index.search(pattern=r'code \d+$')[0]) == ['error code 502', 'error code 500']
+    assert messages(index.search('error', since='2026-03-01T00:00:00')[0]) == ['error code abc', 'error code 502']
+    assert messages(index.search('error', until='2026-03-01T00:00:00')[0]) == ['error code 500']
+
+
+def test_paging_with_before_id(index):
+    add_lines(index, 'a', [f'match {number}' for number in range(5)])
+
+    first, has_more = index.search('match', limit=2)
+    assert has_more and messages(first) == ['match 4', 'match 3']
+    second, _ = index.search('match', limit=2, before_id=first[-1]['id'])
+    assert messages(second) == ['match 2', 'match 1']
+
+
+def test_search_after_clearing_a_process(index, tmp_path):
+    manager = app.ProcessManager(log_index=index)
+    for command_id in ('keep', 'drop'):
+        manager.logs[command_id] = app.LogRingBuffer(manager.max_logs)
+        manager.spools[command_id] = app.ProcessLogSpool(str(tmp_path / command_id))
+        manager.metadata[command_id] = {'command_id': command_id, 'status': 'running'}
+    manager._append_output([('keep', ['needle in keep']), ('drop', ['needle in drop'])])
+
+    assert manager.clear_process('drop')
+    # Строки, дошедшие после очистки, не должны вернуться ни в буфер, ни в индекс
+    manager._append_output([('drop', ['needle after clear'])])
+    assert index.flush()
+
+    assert messages(index.search('needle')[0]) == ['needle in keep']
+    assert 'drop' not in manager.logs
+
+
+def test_purge_drops_only_rows_past_retention(tmp_path):
+    index = app.ProcessLogIndex(str(tmp_path / 'logs.sqlite3'), retention_days=1)
+    now = datetime.utcnow()
+    add_lines(index, 'old', ['stale line'], timestamp=(now - timedelta(days=2)).isoformat())
+    add_lines(index, 'new', ['fresh line'], timestamp=now.isoformat())
+
+    # Пачка, записанная сразу после старта, не должна запускать чистку
+    assert messages(index.search('line')[0]) == ['fresh line', 'stale line']
+    index.purge()
+    assert messages(index.search('line')[0]) == ['fresh line']
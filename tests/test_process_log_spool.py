@@ -0,0 +1,82 @@
+"""Журнал процесса на диске: ротация сегментов и чтение по индексу смещений"""
+
+import os
+
+import app
+
+
+def make_spool(tmp_path, count, **options):
+    spool = app.ProcessLogSpool(str(tmp_path / 'spool'), **options)
+    for seq in range(1, count + 1):
+        spool.append({'seq': seq, 'timestamp': '2026-01-01T00:00:00', 'message': f'line {seq}'})
+    return spool
+
+
+def seqs(entries):
+    return [entry['seq'] for entry in entries]
+
+
+def test_rotation_creates_segments_with_index_point_at_each_start(tmp_path):
+    spool = make_spool(tmp_path, 2000, segment_bytes=4096, max_bytes=0, index_interval=64)
+
+    assert len(spool.segments) > 1
+    assert sorted(os.listdir(spool.directory)) == [f'{number:05d}.log' for number, _ in spool.segments]
+    starts = {segment: seq for seq, segment, offset in reversed(spool.index) if offset == 0}
+    assert set(starts) == {number for number, _ in spool.segments}
+    assert spool.index_seqs == sorted(spool.index_seqs)
+
+
+def test_read_any_range_across_segment_boundaries(tmp_path):
+    spool = make_spool(tmp_path, 2000, segment_bytes=4096, max_bytes=0, index_interval=64)
+
+    for start in (1, 63, 64, 65, 777, 1999):
+        assert seqs(spool.read(start, 50)) == list(range(start, min(start + 50, 2001)))
+    assert [entry['message'] for entry in spool.read(1234, 2)] == ['line 1234', 'line 1235']
+    assert seqs(spool.tail(3)) == [1998, 1999, 2000]
+    assert spool.read(2001, 10) == []
+
+
+def test_read_flushes_pending_writes(tmp_path):
+    spool = make_spool(tmp_path, 10)
+    spool.append({'seq': 11, 'timestamp': '2026-01-01T00:00:00', 'message': 'fresh'})
+
+    assert spool.read(11, 1)[0]['message'] == 'fresh'
+
+
+def test_size_limit_drops_oldest_segments_and_moves_first_seq(tmp_path):
+    spool = make_spool(tmp_path, 2000, segment_bytes=1000, max_bytes=5000, index_interval=16)
+
+    assert sum(size for _, size in spool.segments) <= 5000 + 1000
+    assert len(os.listdir(spool.directory)) == len(spool.segments)
+    assert spool.first_seq == spool.index_seqs[0] > 1
+    assert seqs(spool.read(1, 3)) == [spool.first_seq, spool.first_seq + 1, spool.first_seq + 2]
+    assert seqs(spool.tail(2)) == [1999, 2000]
+
+
+def test_removed_spool_ignores_late_writes(tmp_path):
+    spool = make_spool(tmp_path, 5)
+    spool.remove()
+    spool.append({'seq': 6, 'timestamp': '2026-01-01T00:00:00', 'message': 'late'})
+
+    assert not os.path.exists(spool.directory)
+
+
+def test_manager_serves_evicted_lines_from_spool(tmp_path):
+    manager = app.ProcessManager()
+    manager.max_logs = 10
+    manager.logs['p'] = app.LogRingBuffer(manager.max_logs)
+    manager.spools['p'] = app.ProcessLogSpool(str(tmp_path / 'p'), segment_bytes=2048, index_interval=8)
+    manager.metadata['p'] = {'command_id': 'p', 'status': 'running'}
+    manager._append_output([('p', [f'line {number}' for number in range(1, 101)])])
+
+    entries, first_seq, last_seq = manager.read_logs('p', start=5, count=10)
+    assert seqs(entries) == list(range(5, 15))
+    assert (first_seq, last_seq) == (1, 100)
+    assert seqs(manager.read_logs('p', tail=15)[0]) == list(range(86, 101))
+
+    entries, dropped, last_seq = manager.get_logs('p', since=40)
+    assert seqs(entries) == list(range(41, 101))
+    assert dropped == 0
+    entries, dropped, _ = manager.get_logs('p', since=40, limit=20)
+    assert seqs(entries) == list(range(81, 101))
+    assert dropped == 40
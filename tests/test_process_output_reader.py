@@ -0,0 +1,84 @@
+"""Общий читатель вывода процессов: разбиение на строки и доставка менеджеру"""
+
+import shlex
+import sys
+import time
+
+import pytest
+
+import app
+
+
+def stream():
+    return {'buffer': b'', 'after_cr': False}
+
+
+def test_split_lines_keeps_unfinished_tail():
+    state = stream()
+    assert app.ProcessOutputReader._split_lines(state, b'first\nsecond\r\nthi') == ['first', 'second']
+    assert state['buffer'] == b'thi'
+    assert app.ProcessOutputReader._split_lines(state, b'rd\n') == ['third']
+    assert state['buffer'] == b''
+
+
+def test_split_lines_treats_bare_carriage_return_as_line_end():
+    state = stream()
+    assert app.ProcessOutputReader._split_lines(state, b'progress 10%\rprogress 20%\r') == [
+        'progress 10%', 'progress 20%',
+    ]
+    assert state['after_cr']
+    # \n сразу после \r из прошлого куска - вторая половина \r\n, а не пустая строка
+    assert app.ProcessOutputReader._split_lines(state, b'\ndone\n') == ['done']
+    assert not state['after_cr']
+
+
+def test_split_lines_flushes_overlong_lines(monkeypatch):
+    monkeypatch.setattr(app, 'PROCESS_OUTPUT_MAX_LINE', 8)
+    state = stream()
+    assert app.ProcessOutputReader._split_lines(state, b'x' * 20) == ['x' * 20]
+    assert state['buffer'] == b''
+
+
+def test_split_lines_replaces_invalid_utf8():
+    assert app.ProcessOutputReader._split_lines(stream(), b'ok \xff\n') == ['ok �']
+
+
+def wait_finished(manager, command_ids, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with manager.lock:
+            if all(manager.metadata[command_id]['status'] != 'running' for command_id in command_ids):
+                return
+        time.sleep(0.02)
+    pytest.fail('processes did not finish in time')
+
+
+@pytest.mark.skipif(not app.PROCESS_OUTPUT_MULTIPLEX, reason='общий читатель работает только на POSIX')
+def test_one_reader_delivers_output_of_several_processes(tmp_path):
+    script = tmp_path / 'emit.py'
+    script.write_text(
+        'import sys, time\n'
+        'name = sys.argv[1]\n'
+        'for number in range(3):\n'
+        '    sys.stdout.write(f"{name} step {number}\\r")\n'
+        '    sys.stdout.flush()\n'
+        '    time.sleep(0.01)\n'
+        'sys.stdout.write(f"{name} done\\nno newline at end")\n'
+    )
+    manager = app.ProcessManager()
+    command_ids = ['alpha', 'beta', 'gamma']
+    for command_id in command_ids:
+        command = f'{shlex.quote(sys.executable)} {shlex.quote(str(script))} {command_id}'
+        assert manager.start_process(command_id, command, cwd=str(tmp_path)) is True
+    wait_finished(manager, command_ids)
+
+    for command_id in command_ids:
+        entries, dropped, last_seq = manager.get_logs(command_id)
+        assert [entry['message'] for entry in entries] == [
+            f'{command_id} step 0', f'{command_id} step 1', f'{command_id} step 2',
+            f'{command_id} done', 'no newline at end',
+        ]
+        assert dropped == 0 and last_seq == 5
+        assert manager.metadata[command_id]['status'] == 'finished'
+        assert manager.metadata[command_id]['exit_code'] == 0
+    assert manager.output_reader.thread.is_alive()
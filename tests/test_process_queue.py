@@ -0,0 +1,136 @@
+"""Очередь запуска процессов: приоритеты, общий и семейные лимиты"""
+
+import pytest
+
+import app
+
+
+class FakeProcess:
+    pid = 4242
+
+    def __init__(self):
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+    def terminate(self):
+        self.returncode = -15
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    manager = app.ProcessManager(max_concurrent=2, family_limits={'sync': 1})
+    manager.started = []
+
+    def fake_start(command_id, command, cwd=None):
+        if command == 'broken':
+            return False, 'boom'
+        with manager.lock:
+            manager.processes[command_id] = FakeProcess()
+            manager.metadata[command_id].update({'status': 'running', 'pid': FakeProcess.pid})
+        manager.started.append(command_id)
+        return True
+
+    monkeypatch.setattr(manager, 'start_process', fake_start)
+    return manager
+
+
+def finish(manager, command_id):
+    process = manager.processes[command_id]
+    process.returncode = 0
+    manager._finish_output(command_id, process)
+
+
+def test_starts_immediately_then_queues_with_positions(manager):
+    first = manager.submit('a', 'cmd', family='x')
+    second = manager.submit('b', 'cmd', family='x')
+    third = manager.submit('c', 'cmd', family='x')
+    fourth = manager.submit('d', 'cmd', family='x')
+
+    assert [first['status'], second['status']] == ['running', 'running']
+    assert (third['status'], third['queue_position']) == ('queued', 1)
+    assert fourth['queue_position'] == 2
+    assert [item['command_id'] for item in manager.get_queue()['queued']] == ['c', 'd']
+
+    finish(manager, 'a')
+    assert manager.started == ['a', 'b', 'c']
+    assert manager.queue_position('d') == 1
+
+
+def test_priority_first_then_submission_order(manager):
+    manager.submit('a', 'cmd')
+    manager.submit('b', 'cmd')
+    manager.submit('low', 'cmd', priority=0)
+    manager.submit('high', 'cmd', priority=5)
+    manager.submit('low2', 'cmd', priority=0)
+
+    assert [item['command_id'] for item in manager.get_queue()['queued']] == ['high', 'low', 'low2']
+    finish(manager, 'a')
+    finish(manager, 'b')
+    assert manager.started[2:] == ['high', 'low']
+
+
+def test_family_limit_skips_blocked_family_only(manager):
+    manager.submit('sync1', 'cmd', family='sync')
+    blocked = manager.submit('sync2', 'cmd', family='sync')
+    other = manager.submit('mod', 'cmd', family='x')
+
+    assert blocked['status'] == 'queued'
+    assert other['status'] == 'running'
+    assert manager.get_queue()['running_by_family'] == {'sync': 1, 'x': 1}
+
+    finish(manager, 'sync1')
+    assert manager.started == ['sync1', 'mod', 'sync2']
+
+
+def test_multi_slot_head_is_not_overtaken(manager):
+    manager.submit('a', 'cmd')
+    big = manager.submit('big', 'cmd', slots=2)
+    small = manager.submit('small', 'cmd')
+
+    assert big['status'] == small['status'] == 'queued'
+    assert big['slots'] == 2
+    finish(manager, 'a')
+    assert manager.started == ['a', 'big']
+    finish(manager, 'big')
+    assert manager.started == ['a', 'big', 'small']
+
+
+def test_slots_are_capped_by_global_limit(manager):
+    job = manager.submit('huge', 'cmd', slots=50)
+
+    assert job['status'] == 'running'
+    assert job['slots'] == 2
+
+
+def test_stop_and_clear_remove_queued_commands(manager):
+    manager.submit('a', 'cmd')
+    manager.submit('b', 'cmd')
+    manager.submit('stopped', 'cmd')
+    manager.submit('cleared', 'cmd')
+
+    assert manager.stop_process('stopped')
+    assert manager.get_process_status('stopped') == 'stopped'
+    assert manager.clear_process('cleared')
+    finish(manager, 'a')
+    assert manager.started == ['a', 'b']
+    assert manager.get_queue()['queued'] == []
+
+
+def test_duplicate_ids_get_suffixes(manager):
+    ids = [manager.submit('cmd_1', 'cmd')['command_id'] for _ in range(3)]
+
+    assert ids == ['cmd_1', 'cmd_1_2', 'cmd_1_3']
+
+
+def test_start_failure_raises_and_frees_the_slot(manager):
+    with pytest.raises(RuntimeError, match='boom'):
+        manager.submit('bad', 'broken')
+    assert manager.get_process_status('bad') == 'failed'
+    assert manager.submit('next', 'cmd')['status'] == 'running'
+
+
+def test_default_slots_have_a_generous_floor():
+    assert app._default_process_slots() >= app.PROCESS_DEFAULT_MIN_SLOTS
+    assert app._parse_family_limits('sync=1, x=bad,,y=3') == {'sync': 1, 'y': 3}
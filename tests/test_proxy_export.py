@@ -0,0 +1,58 @@
+"""Выгрузка результатов: форматы и запись файлов без перезаписи"""
+
+import errno
+import json
+import os
+
+import pytest
+
+import app
+
+RESULTS = [
+    {'proxy': 'slow:1', 'ip': '10.0.0.2', 'connect_ms': 3.0, 'total_ms': 90.0},
+    {'proxy': 'fast:1', 'ip': '10.0.0.1', 'connect_ms': 1.0, 'total_ms': 10.0},
+    {'proxy': 'unknown:1', 'ip': '10.0.0.3', 'connect_ms': None, 'total_ms': None},
+]
+
+
+def export(fmt, results=RESULTS, chunk_rows=2):
+    return ''.join(app.iter_proxy_export(results, fmt, chunk_rows=chunk_rows))
+
+
+def test_export_formats():
+    assert export('tsv') == 'slow:1\nfast:1\nunknown:1\n'
+    assert export('csv').splitlines()[0] == 'proxy,ip,connect_ms,total_ms'
+    rows = [json.loads(line) for line in export('ndjson').splitlines()]
+    assert rows == RESULTS
+
+
+def test_latency_sort_and_filter():
+    ordered = app.present_proxy_results(RESULTS, 'latency')
+    assert ordered == ['fast:1', 'slow:1', 'unknown:1']
+    assert [result['proxy'] for result in app.filter_proxy_results(RESULTS, max_latency_ms=50)] == ['fast:1']
+
+
+def test_write_new_file_never_overwrites(tmp_path):
+    names = [app.write_new_file(str(tmp_path), 'proxies.tsv', [f'run {number}\n']) for number in range(3)]
+
+    assert names == ['proxies.tsv', 'proxies_2.tsv', 'proxies_3.tsv']
+    assert (tmp_path / 'proxies_2.tsv').read_text() == 'run 1\n'
+    assert sorted(os.listdir(tmp_path)) == sorted(names)
+
+
+def test_write_new_file_without_hardlink_support(tmp_path, monkeypatch):
+    def no_links(source, target):
+        raise OSError(errno.EPERM, 'Operation not permitted')
+
+    monkeypatch.setattr(app.os, 'link', no_links)
+    (tmp_path / 'proxies.tsv').write_text('old\n')
+
+    assert app.write_new_file(str(tmp_path), 'proxies.tsv', ['new\n']) == 'proxies_2.tsv'
+    assert (tmp_path / 'proxies.tsv').read_text() == 'old\n'
+    assert (tmp_path / 'proxies_2.tsv').read_text() == 'new\n'
+    assert sorted(os.listdir(tmp_path)) == ['proxies.tsv', 'proxies_2.tsv']
+
+
+def test_write_new_file_reports_other_errors(tmp_path):
+    with pytest.raises(OSError):
+        app.write_new_file(str(tmp_path / 'missing'), 'proxies.tsv', ['x\n'])
@@ -0,0 +1,95 @@
+"""Кэш здоровья прокси: TTL, цель проверки и выдача из кэша"""
+
+import sqlite3
+import time
+
+import pytest
+
+import app
+
+TARGET = 'http://target.example/ip'
+OTHER_TARGET = 'http://other.example/ip'
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return app.ProxyHealthCache(str(tmp_path / 'health.sqlite3'))
+
+
+def test_database_is_opened_on_first_use(tmp_path):
+    db_path = tmp_path / 'lazy.sqlite3'
+    cache = app.ProxyHealthCache(str(db_path))
+    assert not db_path.exists()
+
+    cache.record([('http://a:1', False, None, None, time.time())], TARGET)
+    assert db_path.exists()
+
+
+def test_lookup_honours_ttl(cache):
+    now = time.time()
+    cache.record([
+        ('http://fresh:1', True, '10.0.0.1', {'connect_ms': 1.0, 'total_ms': 5.0}, now - 10),
+        ('http://stale:1', True, '10.0.0.2', {'connect_ms': 1.0, 'total_ms': 5.0}, now - 100),
+        ('http://dead:1', False, None, None, now - 10),
+    ], TARGET)
+
+    found = cache.lookup(['http://fresh:1', 'http://stale:1', 'http://dead:1', 'http://new:1'], 60, TARGET)
+    assert found == {
+        'http://fresh:1': (True, '10.0.0.1', {'connect_ms': 1.0, 'total_ms': 5.0}),
+        'http://dead:1': (False, None, None),
+    }
+    assert cache.lookup(['http://fresh:1'], 0, TARGET) == {}
+
+
+def test_results_are_kept_per_probe_target(cache):
+    cache.record([('http://a:1', True, '10.0.0.1', {'connect_ms': 1.0, 'total_ms': 5.0}, time.time())], TARGET)
+
+    assert 'http://a:1' in cache.lookup(['http://a:1'], 60, TARGET)
+    assert cache.lookup(['http://a:1'], 60, OTHER_TARGET) == {}
+
+
+def test_purge_drops_old_rows(cache):
+    now = time.time()
+    cache.record([('http://old:1', False, None, None, now - 1000), ('http://new:1', False, None, None, now)], TARGET)
+    cache.purge(max_age=500)
+
+    assert list(cache.lookup(['http://old:1', 'http://new:1'], 5000, TARGET)) == ['http://new:1']
+
+
+def test_old_schema_without_probe_target_is_recreated(tmp_path):
+    db_path = str(tmp_path / 'health.sqlite3')
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE proxy_health (proxy TEXT PRIMARY KEY, is_working INTEGER NOT NULL, ip TEXT, '
+                 'connect_ms REAL, total_ms REAL, checked_at REAL NOT NULL)')
+    conn.execute('INSERT INTO proxy_health VALUES (?, 1, ?, 1, 5, ?)', ('http://a:1', '10.0.0.1', time.time()))
+    conn.commit()
+    conn.close()
+
+    cache = app.ProxyHealthCache(db_path)
+    assert cache.lookup(['http://a:1'], 60, TARGET) == {}
+
+
+def test_apply_health_cache_serves_fresh_results_and_stops(cache):
+    now = time.time()
+    cache.record([(f'http://p{number}:1', True, f'10.0.0.{number}', None, now) for number in range(5)], TARGET)
+    entries = [(f'http://p{number}:1', f'p{number}:1') for number in range(7)]
+    served = []
+
+    probed = list(app._apply_health_cache(
+        iter(entries), cache, 60, lambda entry, *result: served.append(entry[1]), probe_url=TARGET
+    ))
+    assert served == [f'p{number}:1' for number in range(5)]
+    assert [entry[1] for entry in probed] == ['p5:1', 'p6:1']
+
+    served.clear()
+    probed = list(app._apply_health_cache(
+        iter(entries), cache, 60, lambda entry, *result: served.append(entry[1]),
+        should_stop=lambda: len(served) >= 2, probe_url=TARGET,
+    ))
+    assert served == ['p0:1', 'p1:1'] and probed == []
+
+    served.clear()
+    probed = list(app._apply_health_cache(
+        iter(entries), cache, 60, lambda entry, *result: served.append(entry[1]), probe_url=OTHER_TARGET
+    ))
+    assert served == [] and len(probed) == 7
@@ -0,0 +1,105 @@
+"""Пул прокси: аренда, отчеты и исключение нерабочих"""
+
+import time
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = app.ProxyPool(lease_ttl=60, max_failures=2, min_health=0.3)
+    monkeypatch.setattr(app, 'proxy_pool', pool)
+    return pool
+
+
+def members(pool):
+    return sorted(member['proxy'] for member in pool.snapshot()['members'])
+
+
+def test_discard_evicts_only_known_members(pool):
+    pool.load([{'proxy': 'a:1'}, {'proxy': 'b:1'}])
+
+    assert pool.discard('a:1')
+    assert not pool.discard('a:1')
+    assert not pool.discard('missing:1')
+    assert members(pool) == ['b:1']
+    assert pool.snapshot()['evicted'] == 1
+
+
+def test_proxy_test_evicts_members_it_found_failing(pool, monkeypatch):
+    pool.load([{'proxy': 'good:1'}, {'proxy': 'dead:1'}, {'proxy': 'untested:1'}, {'proxy': 'unreachable:1'}])
+
+    def fake_runner(entries, handle_result, should_stop, concurrency, **options):
+        for entry in entries:
+            if entry[1] == 'good:1':
+                handle_result(entry, True, '10.0.0.1', {'connect_ms': 1, 'total_ms': 5})
+            elif entry[1] == 'unreachable:1':
+                # Непройденная предварительная стадия - не повод исключать
+                handle_result(entry, False, None, None, probed=False)
+            else:
+                handle_result(entry, False, None, None)
+
+    monkeypatch.setitem(app.PROXY_TEST_RUNNERS, 'threads', fake_runner)
+    monkeypatch.setattr(app, 'preresolve_entries', lambda entries, *args, **kwargs: entries)
+    job = app.ProxyTestJob('pool-eviction', engine='threads', cache_ttl=0)
+    app.run_proxy_test(job, ['good:1', 'dead:1', 'unreachable:1'])
+
+    assert members(pool) == ['good:1', 'unreachable:1', 'untested:1']
+
+
+def test_lease_prefers_exit_ips_nobody_holds(pool):
+    pool.load([
+        {'proxy': 'a:1', 'ip': '10.0.0.1', 'total_ms': 10},
+        {'proxy': 'b:1', 'ip': '10.0.0.1', 'total_ms': 10},
+        {'proxy': 'c:1', 'ip': '10.0.0.2', 'total_ms': 10},
+    ])
+
+    first = pool.lease(client='worker-1')
+    second = pool.lease(client='worker-2')
+    third = pool.lease()
+    assert first['ip'] != second['ip']
+    assert len({first['proxy'], second['proxy'], third['proxy']}) == 3
+    # Свободных не осталось: выдается любой, но аренда все равно учитывается
+    assert pool.lease() is not None
+    assert pool.snapshot()['leased'] == 4
+
+
+def test_failed_reports_evict_after_max_failures(pool):
+    pool.load([{'proxy': 'a:1', 'ip': '10.0.0.1', 'total_ms': 10}])
+
+    state = pool.report(pool.lease()['lease_id'], success=False)
+    assert state['evicted'] is False
+    state = pool.report(pool.lease()['lease_id'], success=False)
+    assert state['evicted'] is True
+    assert pool.lease() is None
+    assert pool.report('unknown', success=True) is None
+
+
+def test_success_reports_smooth_latency_and_restore_health(pool):
+    pool.load([{'proxy': 'a:1', 'ip': '10.0.0.1', 'total_ms': 100}])
+    pool.report(pool.lease()['lease_id'], success=False)
+
+    state = pool.report(pool.lease()['lease_id'], success=True, latency_ms=200)
+    member = pool.snapshot()['members'][0]
+    assert member['latency_ms'] == 130.0
+    assert member['consecutive_failures'] == 0 and member['successes'] == 1
+    assert state['health'] == round(member['health'], 3) == 0.84
+
+
+def test_expired_lease_returns_proxy_without_changing_stats(pool):
+    pool.load([{'proxy': 'a:1', 'ip': '10.0.0.1', 'total_ms': 10}])
+    lease = pool.lease(ttl=0.01)
+    time.sleep(0.02)
+
+    snapshot = pool.snapshot()
+    assert snapshot['leased'] == 0 and snapshot['members'][0]['leased'] == 0
+    assert snapshot['members'][0]['health'] == 1.0
+    assert pool.report(lease['lease_id'], success=False) is None
+
+
+def test_load_with_replace_drops_missing_members(pool):
+    pool.load([{'proxy': 'a:1'}, {'proxy': 'b:1'}])
+    assert pool.load([{'proxy': 'b:1'}, {'proxy': 'c:1'}], replace=True) == 2
+    assert members(pool) == ['b:1', 'c:1']
@@ -0,0 +1,57 @@
+"""Фоновая перепроверка выгруженных файлов прокси"""
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def revalidator(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'PROXIES_DIR', str(tmp_path))
+    monkeypatch.setattr(app, 'proxy_pool', app.ProxyPool())
+    monkeypatch.setattr(app, 'preresolve_entries', lambda entries, *args, **kwargs: entries)
+
+    def fake_runner(entries, handle_result, should_stop, concurrency, **options):
+        for entry in entries:
+            if entry is app._ENTRY_PENDING:
+                # Ограничитель скорости еще не выдал следующую запись
+                continue
+            if entry[1].startswith('good'):
+                handle_result(entry, True, '10.0.0.1', {'connect_ms': 1, 'total_ms': 5})
+            else:
+                handle_result(entry, False, None, None)
+
+    monkeypatch.setitem(app.PROXY_TEST_RUNNERS, app.DEFAULT_PROXY_TEST_ENGINE, fake_runner)
+    manager = app.ProxyTestManager(app.ProbeBudget(10))
+    file_health = app.ProxyFileHealth(str(tmp_path / 'health.sqlite3'))
+    return app.ProxyRevalidator(manager, file_health, interval=0)
+
+
+def test_rewrite_keeps_unparsed_lines_and_counts_removed_ones(revalidator, tmp_path):
+    (tmp_path / 'proxies01.tsv').write_text(
+        'good1:8080\n'
+        'dead1:8080\n'
+        'not a proxy\n'
+        'good1:8080\n'
+        'good2:8080:user:pass\n'
+    )
+    job = revalidator.create_job('proxies01.tsv')
+    stats = revalidator.run(job, 'proxies01.tsv')
+
+    assert (tmp_path / 'proxies01.tsv').read_text().splitlines() == [
+        'good1:8080', 'good2:8080:user:pass', 'not a proxy',
+    ]
+    assert stats['rewritten'] == 1
+    assert (stats['total'], stats['working'], stats['duplicates'], stats['invalid'], stats['pruned']) == (3, 2, 1, 1, 2)
+    recorded = revalidator.file_health.all()[0]
+    assert recorded['pruned'] == 2 and recorded['invalid'] == 1
+
+
+def test_file_without_working_proxies_is_left_alone(revalidator, tmp_path):
+    (tmp_path / 'proxies02.tsv').write_text('dead1:8080\ndead2:8080\n')
+    job = revalidator.create_job('proxies02.tsv')
+    stats = revalidator.run(job, 'proxies02.tsv')
+
+    assert stats['rewritten'] == 0 and stats['error']
+    assert (tmp_path / 'proxies02.tsv').read_text() == 'dead1:8080\ndead2:8080\n'
+    assert revalidator.create_job('proxies02.tsv') is not None
@@ -0,0 +1,60 @@
+"""Выдача по курсору: результаты тестов прокси и кольцевой буфер логов"""
+
+import app
+
+
+def result(number, total_ms=None):
+    return {'proxy': f'p{number}:1', 'ip': f'10.0.0.{number}', 'connect_ms': 1.0, 'total_ms': total_ms}
+
+
+def test_result_log_pages_after_cursor():
+    log = app.ProxyResultLog()
+    for number in range(5):
+        assert log.append('working', result(number)) == number + 1
+
+    events, latest = log.since(0, limit=2)
+    assert [event['seq'] for event in events] == [1, 2] and latest == 5
+    events, _ = log.since(2, limit=2)
+    assert [event['proxy'] for event in events] == ['p2:1', 'p3:1']
+    assert log.since(5)[0] == []
+    assert [event['seq'] for event in log.since(-3, limit=1)[0]] == [1]
+
+
+def test_results_payload_cursor_and_completion():
+    job = app.ProxyTestJob('paging')
+    job.results.append('working', result(1, 30.0))
+    job.results.append('unique', result(1, 30.0))
+    job.results.append('working', result(2, 10.0))
+
+    payload = app._proxy_results_payload(job, since=0, limit=2)
+    assert payload['seq'] == 2 and payload['latest_seq'] == 3 and payload['has_more']
+    assert [item['proxy'] for item in payload['working']] == ['p1:1']
+    assert [item['proxy'] for item in payload['unique']] == ['p1:1']
+    assert 'latency' not in payload
+
+    job.working = [result(1, 30.0), result(2, 10.0)]
+    job.progress['is_running'] = False
+    payload = app._proxy_results_payload(job, since=payload['seq'])
+    assert payload['seq'] == 3 and not payload['has_more'] and not payload['is_running']
+    assert [item['seq'] for item in payload['working']] == [3]
+    assert payload['latency']['total_ms']['p50'] is not None
+
+    # Курсор за концом журнала не уходит дальше последнего события
+    assert app._proxy_results_payload(job, since=10)['seq'] == 3
+    assert app._proxy_results_payload(None, since=0)['job_id'] is None
+
+
+def test_ring_buffer_since_reports_dropped_lines():
+    buffer = app.LogRingBuffer(3)
+    for number in range(5):
+        buffer.append({'message': f'line {number}'})
+
+    assert len(buffer) == 3 and buffer.first_seq == 3 and buffer.last_seq == 5
+    entries, dropped = buffer.since(0)
+    assert [entry['seq'] for entry in entries] == [3, 4, 5] and dropped == 2
+    entries, dropped = buffer.since(4)
+    assert [entry['message'] for entry in entries] == ['line 4'] and dropped == 0
+    entries, dropped = buffer.since(1, limit=1)
+    assert [entry['seq'] for entry in entries] == [5] and dropped == 3
+    assert buffer.since(5) == ([], 0)
+